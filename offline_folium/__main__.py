@@ -1,40 +1,242 @@
-from urllib.request import urlopen
+from concurrent.futures import Future, ThreadPoolExecutor
+import asyncio
+import hashlib
+import json
 import os
+import shutil
 import sys
 
-import folium
-import folium.plugins
-from .paths import dest_path
+import urllib3
+from .paths import basename_from_url, get_dest_path, local_path
 from .plugin import handle_plugin_name
 
-def download_all_files(plugins_name=None):
-    if not os.path.exists(dest_path):
-        os.makedirs(dest_path)
-    for _, js_url in folium.folium._default_js:
-        download_url(js_url)
-    for _, js_url in folium.folium._default_css:
-        download_url(js_url)
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+USER_AGENT = "offline-folium/0.1"
+META_FILE = ".etags.json"
+CHUNK_SIZE = 1 << 16
+
+# Shared pool so the serial fallback reuses connections to the CDN hosts
+_HTTP = urllib3.PoolManager(num_pools=4, maxsize=8, headers={"User-Agent": USER_AGENT})
+
+
+def collect_urls(plugins_name=None):
+    """Returns the URLs of the Javascript/CSS needed by folium and the plugins.
+
+    Each local file name is only downloaded once, so URLs shared by the map
+    and several plugins (leaflet, jquery, ...) appear once in the result.
+    """
+    import folium
+
+    components = {
+        "folium": [url for _, url in folium.folium._default_js]
+        + [url for _, url in folium.folium._default_css]
+    }
     for plugin in handle_plugin_name(plugins_name):
-        for _, js_url in plugin.default_css:
-            download_url(js_url)
-        for _, js_url in plugin.default_js:
-            download_url(js_url)
+        components[plugin.__name__] = [url for _, url in plugin.default_css] + [
+            url for _, url in plugin.default_js
+        ]
+
+    urls_by_name = {}
+    for component, urls in components.items():
+        new = 0
+        for url in urls:
+            name = basename_from_url(url)
+            if name not in urls_by_name:
+                urls_by_name[name] = url
+                new += 1
+        print(f"{component}: {len(urls)} files, {new} not already listed")
+    return sorted(urls_by_name.values())
+
+
+def download_all_files(plugins_name=None):
+    """Downloads all files and returns the list of URLs that failed."""
+    get_dest_path(create=True)
+    urls = collect_urls(plugins_name)
+    meta = _load_meta()
+    # Disk writes run on worker threads so they overlap with the next fetch
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        if httpx is None:
+            results = []
+            for url in urls:
+                try:
+                    results.append(download_url(url, meta, executor))
+                except Exception as e:
+                    results.append(e)
+            results = [_write_result(result) for result in results]
+        else:
+            results = asyncio.run(_download_all(urls, meta, executor))
+    _save_meta(meta)
+
+    errors = [
+        (url, result) for url, result in zip(urls, results) if isinstance(result, Exception)
+    ]
+    unchanged = sum(result is False for result in results)
+    print(
+        f"\n{len(urls) - len(errors) - unchanged} downloaded, "
+        f"{unchanged} unchanged, {len(errors)} failed"
+    )
+    for url, error in errors:
+        print(f"Failed to download {url}: {error!r}")
+    return [url for url, _ in errors]
+
+
+def _load_meta():
+    """Returns the stored ETag/Last-Modified values, keyed by URL."""
+    meta_path = os.path.join(get_dest_path(), META_FILE)
+    if not os.path.exists(meta_path):
+        return {}
+    with open(meta_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_meta(meta):
+    with open(os.path.join(get_dest_path(), META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2, sort_keys=True)
+
+
+def _sha256(path):
+    with open(path, "rb") as f:
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+        return digest.hexdigest()
 
 
-def download_url(url):
-    output_path = os.path.join(dest_path, os.path.basename(url))
+def _conditional_headers(meta, url, output_path):
+    """Returns the headers that let the server answer 304 for an unchanged file.
+
+    A local file whose SHA-256 no longer matches the one recorded when it was
+    downloaded gets no conditional headers, so it is fetched again in full.
+    """
+    entry = meta.get(url)
+    if not entry or not os.path.exists(output_path):
+        return {}
+    if entry.get("sha256") and _sha256(output_path) != entry["sha256"]:
+        print(f"Checksum mismatch for {output_path}")
+        return {}
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def _remember(meta, url, headers, sha256):
+    meta[url] = {
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+        "sha256": sha256,
+    }
+
+
+def _finish(meta, url, output_path, headers):
+    """Moves a completed download into place and records its validators and hash."""
+    part_path = output_path + ".part"
+    sha256 = _sha256(part_path)
+    os.replace(part_path, output_path)
+    _remember(meta, url, headers, sha256)
+    return True
+
+
+def _store(meta, url, output_path, response):
+    """Streams a urllib3 response to disk without buffering the whole body."""
+    try:
+        with open(output_path + ".part", "wb") as f:
+            shutil.copyfileobj(response, f, CHUNK_SIZE)
+    finally:
+        response.release_conn()
+    return _finish(meta, url, output_path, response.headers)
+
+
+def _write_result(result):
+    """Waits for a write submitted by download_url, returning its outcome."""
+    if not isinstance(result, Future):
+        return result
+    try:
+        return result.result()
+    except Exception as e:
+        return e
+
+
+def download_url(url, meta=None, executor=None):
+    """Downloads url, returning False if the local copy was already up to date.
+
+    If an executor is given the body is streamed to disk on it and the pending
+    Future is returned instead of True.
+    """
+    if meta is None:
+        meta = {}
+    output_path = local_path(url)
+    # Request headers replace the pool's defaults, so merge them in here
+    headers = {**_HTTP.headers, **_conditional_headers(meta, url, output_path)}
+    r = _HTTP.request("GET", url, headers=headers, timeout=30, preload_content=False)
+    if r.status == 304:
+        r.drain_conn()
+        print(f"Unchanged {output_path}")
+        return False
+    if r.status >= 400:
+        r.drain_conn()
+        raise OSError(f"{url} returned HTTP {r.status}")
     print(f"Downloading {output_path}")
-    contents = urlopen(url).read().decode("utf8")
-    with open(output_path, "w", encoding='utf-8') as f:
-        f.write(contents)
+    if executor is not None:
+        return executor.submit(_store, meta, url, output_path, r)
+    return _store(meta, url, output_path, r)
+
+
+async def fetch(client, url, meta, executor=None):
+    output_path = local_path(url)
+    loop = asyncio.get_running_loop()
+    # Both helpers hash the whole file, so keep them off the event loop
+    headers = await loop.run_in_executor(
+        executor, _conditional_headers, meta, url, output_path
+    )
+    async with client.stream("GET", url, headers=headers) as r:
+        if r.status_code == 304:
+            print(f"Unchanged {output_path}")
+            return False
+        r.raise_for_status()
+        print(f"Downloading {output_path}")
+        with open(output_path + ".part", "wb") as f:
+            async for chunk in r.aiter_bytes(CHUNK_SIZE):
+                await loop.run_in_executor(executor, f.write, chunk)
+    return await loop.run_in_executor(
+        executor, _finish, meta, url, output_path, r.headers
+    )
+
+
+async def _download_all(urls, meta, executor=None):
+    """Downloads all urls concurrently over one HTTP/2 client.
+
+    CDNs that speak HTTP/2 multiplex every request to them over a single
+    connection; other hosts fall back to pooled HTTP/1.1 connections.
+    """
+    async with httpx.AsyncClient(
+        http2=True,
+        timeout=30,
+        follow_redirects=True,
+        headers={"User-Agent": USER_AGENT},
+    ) as client:
+        return await asyncio.gather(
+            *(fetch(client, url, meta, executor) for url in urls), return_exceptions=True
+        )
+
 
 def main():
     """Main entry point for the offline-folium command."""
-    print(f"Downloading files to {dest_path}")
+    print(f"Downloading files to {get_dest_path(create=True)}")
     if len(sys.argv) > 1:
-        download_all_files(sys.argv[1:])
+        failed = download_all_files(sys.argv[1:])
     else:
-        download_all_files()
+        failed = download_all_files()
+    if failed:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -1,19 +1,25 @@
 
 from branca.element import Figure, Element, CssLink
+from functools import lru_cache
 from jinja2 import Template
-import os
-from .paths import dest_path
+from .paths import local_path
 from .plugin import get_local_plugins
 
+
+@lru_cache(maxsize=None)
+def read_local(path: str) -> str:
+    """Reads a downloaded file, caching it for every later map in the process."""
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
 class Link(Element):
     """An abstract class for embedding a link in the HTML."""
 
     def get_code(self):
         """Opens the link and returns the response's content."""
         if self.code is None:
-            with open(self.url, "r", encoding="utf-8") as f:
-                contents = f.read()
-            self.code = contents
+            self.code = read_local(self.url)
         return self.code
 
     def to_dict(self, depth=-1, **kwargs):
@@ -65,18 +71,26 @@ class CssLink(Link):
         self.code = None
 
 
-import folium
+def is_remote(url: str) -> bool:
+    return url.startswith(("http://", "https://"))
 
-folium.folium._default_js = [
-    (name, os.path.join(dest_path, os.path.basename(url)))
-    for (name, url) in folium.folium._default_js
-]
-folium.folium._default_css = [
-    (name, os.path.join(dest_path, os.path.basename(url)))
-    for (name, url) in folium.folium._default_css
-]
-folium.Map.default_js = folium.folium._default_js
-folium.Map.default_css = folium.folium._default_css
+
+def localize(
+    assets: list[tuple[str, str]], local_paths: dict[str, str]
+) -> list[tuple[str, str]]:
+    """Returns a copy of a default_js/default_css list pointing at local files.
+
+    Lists with no remote URLs left (e.g. a plugin class that inherits an
+    already rewritten list) are returned as they are.
+    """
+    if not any(is_remote(url) for (_, url) in assets):
+        return assets
+    return [
+        (name, local_paths[url] if is_remote(url) else url) for (name, url) in assets
+    ]
+
+
+import folium
 
 folium.elements.JavascriptLink = JavascriptLink
 folium.elements.CssLink = CssLink
@@ -86,12 +100,22 @@ import folium.plugins
 
 plugins = get_local_plugins()
 
+# Resolve each distinct URL once; leaflet, jquery etc. are shared by most plugins
+asset_lists = [folium.folium._default_js, folium.folium._default_css]
+for plugin in plugins:
+    asset_lists += [plugin.default_js, plugin.default_css]
+local_paths = {
+    url: local_path(url)
+    for assets in asset_lists
+    for (_, url) in assets
+    if is_remote(url)
+}
+
+folium.folium._default_js = localize(folium.folium._default_js, local_paths)
+folium.folium._default_css = localize(folium.folium._default_css, local_paths)
+folium.Map.default_js = folium.folium._default_js
+folium.Map.default_css = folium.folium._default_css
+
 for plugin in plugins:
-   plugin.default_js = [
-       (name, os.path.join(dest_path, os.path.basename(url)))
-       for (name, url) in plugin.default_js
-   ]
-   plugin.default_css = [
-       (name, os.path.join(dest_path, os.path.basename(url)))
-       for (name, url) in plugin.default_css
-   ]
+   plugin.default_js = localize(plugin.default_js, local_paths)
+   plugin.default_css = localize(plugin.default_css, local_paths)
@@ -1,11 +1,18 @@
+from functools import cache, lru_cache
 from importlib import resources
 from pathlib import Path
+from urllib.parse import urlsplit
+import os
 
 
-def get_dest_path() -> Path:
+@cache
+def get_dest_path(create: bool = False) -> Path:
     """
     Robust replacement for pkg_resources.resource_filename().
     Works for editable installs and normal installs.
+
+    Resolved on first use rather than at import. With create=True a missing
+    directory is made inside the package instead of raising.
     """
     # Primary: correct modern way
     pkg_path = Path(resources.files("offline_folium") / "local")
@@ -17,11 +24,29 @@ def get_dest_path() -> Path:
     if repo_fallback.exists():
         return repo_fallback
 
+    if create:
+        pkg_path.mkdir(parents=True)
+        return pkg_path
+
     raise FileNotFoundError(
         "Could not locate 'offline_folium/local' directory in package or repo."
     )
 
-#dest_path = resources.files("offline_folium").joinpath("local")
 
-dest_path = get_dest_path()
+def __getattr__(name):
+    # dest_path stays importable without resolving it at import time (PEP 562)
+    if name == "dest_path":
+        return get_dest_path()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@lru_cache(maxsize=4096)
+def basename_from_url(url: str) -> str:
+    """Returns the file name of url, ignoring any query string or fragment."""
+    return urlsplit(url).path.rpartition("/")[2]
+
 
+@lru_cache(maxsize=1024)
+def local_path(url: str) -> str:
+    """Returns the path that the downloaded copy of url is stored at."""
+    return os.path.join(get_dest_path(), basename_from_url(url))
@@ -1,9 +1,19 @@
+from functools import cache
 import pickle
 from pathlib import Path
-import folium.plugins
-from .paths import dest_path
+from .paths import get_dest_path
 
-dump_plugins_path = Path(dest_path) / "plugins.download"
+
+def get_dump_plugins_path() -> Path:
+    return get_dest_path() / "plugins.download"
+
+
+@cache
+def get_available_plugins():
+    """Maps plugin names to classes, importing folium.plugins on first use."""
+    import folium.plugins
+
+    return {name: getattr(folium.plugins, name) for name in folium.plugins.__all__}
 
 
 def handle_plugin_name(plugins_name):
@@ -11,11 +21,11 @@ def handle_plugin_name(plugins_name):
         return []
 
     plugins = []
-    all_valid_plugins = folium.plugins.__all__
+    all_valid_plugins = get_available_plugins()
     for name in plugins_name:
         if name not in all_valid_plugins:
             raise ValueError(f'"{name}" is not a valid folium plugin.')
-        plugins.append(eval(f"folium.plugins.{name}"))
+        plugins.append(all_valid_plugins[name])
     dump_plugins_list(plugins)
 
     return plugins
@@ -23,12 +33,14 @@ def handle_plugin_name(plugins_name):
 
 def dump_plugins_list(plugins) -> None:
     """Serializing for storage"""
+    dump_plugins_path = get_dump_plugins_path()
     with open(dump_plugins_path, "wb") as f:
         pickle.dump(plugins, f)
     print(f"\nDump downloaded plugins list to {dump_plugins_path}")
 
 
 def get_local_plugins():
+    dump_plugins_path = get_dump_plugins_path()
     if not dump_plugins_path.exists():
         return []
 
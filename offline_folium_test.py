@@ -15,7 +15,6 @@ Run:
 
 from __future__ import annotations
 
-import random
 from pathlib import Path
 
 from offline_folium import offline #MUST import BEFORE folium
@@ -29,18 +28,47 @@ def h3_cell_to_geojson_polygon(cell: str) -> dict:
     Convert an H3 cell id to a GeoJSON polygon (lon/lat order).
     """
     # h3.cell_to_boundary returns list of (lat, lng)
-    boundary_latlng = h3.cell_to_boundary(cell)
-    coords_lnglat = [(lng, lat) for (lat, lng) in boundary_latlng]
-    # GeoJSON polygons must be closed (first == last)
-    if coords_lnglat[0] != coords_lnglat[-1]:
-        coords_lnglat.append(coords_lnglat[0])
+    b = np.asarray(h3.cell_to_boundary(cell))
+    # swap to (lng, lat) and close the ring (first == last); H3 boundaries never are
+    coords = np.empty((len(b) + 1, 2))
+    coords[:-1] = b[:, ::-1]
+    coords[-1] = coords[0]
     return {
         "type": "Feature",
         "properties": {"h3": cell},
-        "geometry": {"type": "Polygon", "coordinates": [coords_lnglat]},
+        "geometry": {"type": "Polygon", "coordinates": [coords.tolist()]},
     }
 
 
+def h3_cells_to_geojson_features(cells: list[str]) -> list[dict]:
+    """
+    Convert many H3 cells to GeoJSON polygons in one NumPy pass.
+    Falls back to the per-cell path when boundaries differ in length (pentagons).
+    """
+    boundaries = [h3.cell_to_boundary(c) for c in cells]
+    if len({len(b) for b in boundaries}) != 1:
+        return [h3_cell_to_geojson_polygon(c) for c in cells]
+    # (cells, vertices, lat/lng) -> lng/lat, then close each ring
+    arr = np.asarray(boundaries)[:, :, ::-1]
+    rings = np.concatenate([arr, arr[:, :1, :]], axis=1).tolist()
+    return [
+        {
+            "type": "Feature",
+            "properties": {"h3": cell},
+            "geometry": {"type": "Polygon", "coordinates": [ring]},
+        }
+        for cell, ring in zip(cells, rings)
+    ]
+
+
+# Above this many hexes, outlines are dropped: strokes dominate render cost
+STROKE_MAX_CELLS = 100
+
+# Colour ramp end points: light yellow (low) to red (high)
+LOW_RGB = (255, 245, 200)
+HIGH_RGB = (200, 0, 0)
+
+
 def color_for_value(v: float, vmin: float, vmax: float) -> str:
     """
     Map value to a simple red-ish ramp (no extra deps).
@@ -53,14 +81,30 @@ def color_for_value(v: float, vmin: float, vmax: float) -> str:
     t = float(np.clip(t, 0.0, 1.0))
 
     # interpolate between light yellow and red
-    r1, g1, b1 = (255, 245, 200)
-    r2, g2, b2 = (200, 0, 0)
+    r1, g1, b1 = LOW_RGB
+    r2, g2, b2 = HIGH_RGB
     r = int(r1 + t * (r2 - r1))
     g = int(g1 + t * (g2 - g1))
     b = int(b1 + t * (b2 - b1))
     return f"#{r:02x}{g:02x}{b:02x}"
 
 
+def colors_for_values(vals: np.ndarray, vmin: float, vmax: float) -> list[str]:
+    """
+    Vectorized color_for_value: interpolates all values in one NumPy pass.
+    """
+    vals = np.asarray(vals, dtype=float)
+    if vmax <= vmin:
+        t = np.full_like(vals, 0.5)
+    else:
+        t = np.clip((vals - vmin) / (vmax - vmin), 0.0, 1.0)
+    low, high = np.array(LOW_RGB), np.array(HIGH_RGB)
+    rgb = (low + t[:, None] * (high - low)).astype(np.uint32)
+    # pack each row into 0xRRGGBB so only one integer is formatted per cell
+    packed = (rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2]
+    return [f"#{v:06x}" for v in packed.tolist()]
+
+
 def main() -> None:
     # Pick a center (Denver-ish). Change to wherever you like.
     center_lat, center_lng = 39.7392, -104.9903
@@ -75,8 +119,8 @@ def main() -> None:
     cells = list(h3.grid_disk(center_cell, k))
 
     # Fake data per cell (to test coloring/choropleth)
-    rng = random.Random(42)
-    values = {c: rng.random() for c in cells}
+    rng = np.random.default_rng(42)
+    values = dict(zip(cells, rng.random(len(cells)).tolist()))
     vmin, vmax = min(values.values()), max(values.values())
 
     # Create the folium map
@@ -94,33 +138,38 @@ def main() -> None:
         icon=folium.Icon(color="blue", icon="info-sign"),
     ).add_to(m)
 
-    # Draw each hex polygon
+    # Draw all hex polygons as one FeatureCollection (one layer, not one per cell)
     hex_layer = folium.FeatureGroup(name=f"H3 hexes (res={res}, k={k})", show=True)
 
-    for cell in cells:
-        feature = h3_cell_to_geojson_polygon(cell)
-        val = values[cell]
-        fill = color_for_value(val, vmin, vmax)
-
-        folium.GeoJson(
-            feature,
-            style_function=lambda _feat, fill=fill: {
-                "color": "#333333",
-                "weight": 1,
-                "fillColor": fill,
-                "fillOpacity": 0.55,
-            },
-            tooltip=folium.Tooltip(f"h3={cell}<br>value={val:.3f}"),
-        ).add_to(hex_layer)
+    features = h3_cells_to_geojson_features(cells)
+    fills = colors_for_values([values[c] for c in cells], vmin, vmax)
+    for cell, feature, fill in zip(cells, features, fills):
+        feature["properties"]["value"] = round(values[cell], 3)
+        feature["properties"]["fill"] = fill
+
+    outline = len(cells) <= STROKE_MAX_CELLS
+    folium.GeoJson(
+        {"type": "FeatureCollection", "features": features},
+        style_function=lambda feat: {
+            "color": "#333333" if outline else "transparent",
+            "weight": 1 if outline else 0,
+            "fillColor": feat["properties"]["fill"],
+            "fillOpacity": 0.55,
+        },
+        tooltip=folium.GeoJsonTooltip(
+            fields=["h3", "value"], aliases=["H3", "Value"], sticky=True
+        ),
+    ).add_to(hex_layer)
 
     hex_layer.add_to(m)
 
     # Add a few random points and show which H3 cell they land in
     pts_layer = folium.FeatureGroup(name="Random points", show=True)
-    for i in range(10):
-        # roughly within a few km around center
-        lat = center_lat + rng.uniform(-0.03, 0.03)
-        lng = center_lng + rng.uniform(-0.03, 0.03)
+    # roughly within a few km around center
+    n_pts = 10
+    lats = (center_lat + rng.uniform(-0.03, 0.03, n_pts)).tolist()
+    lngs = (center_lng + rng.uniform(-0.03, 0.03, n_pts)).tolist()
+    for i, (lat, lng) in enumerate(zip(lats, lngs)):
         cell = h3.latlng_to_cell(lat, lng, res)
         folium.CircleMarker(
             location=[lat, lng],
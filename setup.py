@@ -22,5 +22,7 @@ setup(
         'folium',
         'setuptools<81',
         'requests',
+        'httpx[http2]',
+        'urllib3',
     ],
 )
\ No newline at end of file